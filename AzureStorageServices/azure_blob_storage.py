@@ -13,46 +13,133 @@ BlobServiceClient: The BlobServiceClient class allows you to manipulate Azure St
 ContainerClient: The ContainerClient class allows you to manipulate Azure Storage containers and their blobs.
 BlobClient: The BlobClient class allows you to manipulate Azure Storage blobs.
 """
+from __future__ import annotations
+
 #import azure python sdk packages
 from azure.identity import InteractiveBrowserCredential, DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
+from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient, ContentSettings
+from azure.core.credentials import TokenCredential
 from azure.core.exceptions import ResourceExistsError
+from azure.core.pipeline.transport import RequestsTransport
 
 # import other packages
-from typing import Union, Type
-from io import StringIO
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar, Union, cast
+from io import BytesIO, StringIO
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import functools
+import hashlib
+import itertools
+import os
+import queue
+import threading
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    # private azure-core module (not exported), fall back to the plain requests adapter if it moves
+    from azure.core.pipeline.transport._bigger_block_size_http_adapters import BiggerBlockSizeHTTPAdapter
+    _SessionAdapter: Type[HTTPAdapter] = BiggerBlockSizeHTTPAdapter
+except ImportError:
+    _SessionAdapter = HTTPAdapter
+try:
+    import ahocorasick # optional (pip install pyahocorasick), matches many sub strings in one pass
+except ImportError:
+    ahocorasick = None
+
+# number of parallel connections used to transfer the blocks of a single blob,
+# transfers are network bound so we can use more threads than cores.
+DEFAULT_MAX_CONCURRENCY = (os.cpu_count() or 1) * 2
+MiB = 1024 * 1024
+
+# one HTTP session (connection pool) shared by every client created in this module, so the
+# TCP connections and TLS handshakes are reused instead of being redone for every new client.
+# the transport doesn't own the session, closing a client (ex:- 'with blob_service_client:') leaves
+# it open for the other clients, call close_shared_transport() once at shutdown.
+_SHARED_TRANSPORT = RequestsTransport(session=requests.Session(), session_owner=False)
+# requests keeps only 10 connections per host by default, less than the parallel block transfers use.
+# the adapter is the one azure-core mounts on its own sessions when available (32 KiB socket blocks
+# instead of 8 KiB), retries are disabled at this level as the azure pipeline has its own retry policy.
+_SHARED_ADAPTER = _SessionAdapter(pool_maxsize=64,
+                                  max_retries=Retry(total=False, redirect=False, raise_on_status=False))
+for _protocol in ('https://', 'http://'): # http for local emulators such as Azurite
+    _SHARED_TRANSPORT.session.mount(_protocol, _SHARED_ADAPTER)
+
+# clients created by get_blob_Service_client / get_container_Service_client, reused by later calls
+# with the same arguments so the whole process works with one set of warm clients.
+# string credentials (account key / SAS token) are keyed by value, the other credentials by id(credential)
+# (dict credentials aren't hashable), the credential is kept next to its client so that id can't be
+# reused by another object while the entry exists. the lock guards the check-and-insert and the clear.
+_SERVICE_CLIENTS: Dict[tuple, Tuple[object, BlobServiceClient]] = {}
+_CONTAINER_CLIENTS: Dict[tuple, ContainerClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+_CREDENTIAL_TYPES: Dict[str, Callable[[], TokenCredential]] = {'default': DefaultAzureCredential, 'interactive': InteractiveBrowserCredential}
+_CREDENTIAL_LOCK = threading.Lock()
 
-def get_azure_credential(type: str ='default') -> Type['Azure Identity Credential']:
+@functools.lru_cache(maxsize=4)
+def _create_azure_credential(type: str) -> TokenCredential:
+  return _CREDENTIAL_TYPES[type]()
+
+def get_azure_credential(type: str ='default') -> TokenCredential:
   """We need to Authenticate to Azure and authorize access to blob data to perform operations
   
   for that we need to create a credential. Azure provides multiple options for authentication using
   various types are credentials , here we have deault and interactive(browser based userdid/password authentication) 
   credentials.
+
+  The credential is created once per type and reused, it caches the access token so later calls
+  don't go back to AAD (or spawn 'az' / open the browser again). Credentials are safe to share
+  between threads, the lock only makes sure concurrent first calls create a single credential.
   """
-  if type == 'default':
-    credential = DefaultAzureCredential()
-  elif type == 'interactive':
-    credential = InteractiveBrowserCredential()
+  if type not in _CREDENTIAL_TYPES:
+    raise ValueError(f"credential type '{type}' is not supported")
+  with _CREDENTIAL_LOCK:
+    return _create_azure_credential(type)
   
-  return credential
-  
-def get_blob_Service_client(STORAGE_ACCOUNT_URL: str, credential) -> Type['BlobServiceClient object]:
+def get_blob_Service_client(STORAGE_ACCOUNT_URL: str, credential: Union[TokenCredential, Dict[str, str], str],
+                            max_block_size: int = 64*MiB,
+                            max_single_put_size: int = 64*MiB,
+                            max_chunk_get_size: int = 16*MiB) -> BlobServiceClient:
     """Get the BlobServiceClient class that allows you to manipulate Azure Storage resources and blob containers.
 
+    Every block/chunk is a separate REST call with a fixed overhead, the SDK defaults (4 MiB blocks)
+    turn a 1 GB upload into 250 calls, bigger blocks make that overhead negligible.
+
     Attributes
     ----------
       STORAGE_ACCOUNT_URL : URL string that identifies the azure storage account.
-      credential : Credential object which is used for authentication.
+      credential : Credential object which is used for authentication (or an account key / SAS token, as a string or
+                   {'account_name': ..., 'account_key': ...} dict).
+      max_block_size : size of the blocks a large file is split into while uploading (default 64 MiB).
+      max_single_put_size : files up to this size are uploaded with a single request (default 64 MiB),
+                            bigger files are uploaded in blocks of max_block_size.
+      max_chunk_get_size : size of the chunks a blob is downloaded in (default 16 MiB).
     Returns
     -------
-      BlobServiceClient object
+      BlobServiceClient object (the same object is returned for the same arguments)
     """
-    # Create the BlobServiceClient object
-    blob_service_client = BlobServiceClient(STORAGE_ACCOUNT_URL, credential=credential)
-    return blob_service_client
+    credential_key = credential if isinstance(credential, str) else id(credential)
+    key = (STORAGE_ACCOUNT_URL, credential_key, max_block_size, max_single_put_size, max_chunk_get_size)
+    with _CLIENTS_LOCK:
+        if key not in _SERVICE_CLIENTS:
+            # Create the BlobServiceClient object
+            blob_service_client = BlobServiceClient(STORAGE_ACCOUNT_URL, credential=credential, transport=_SHARED_TRANSPORT,
+                                                    max_block_size=max_block_size,
+                                                    max_single_put_size=max_single_put_size,
+                                                    max_chunk_get_size=max_chunk_get_size)
+            _SERVICE_CLIENTS[key] = (credential, blob_service_client)
+        return _SERVICE_CLIENTS[key][1]
+
+def close_shared_transport() -> None:
+    """Close the HTTP session shared by all the clients, call it once when you are done with blob storage."""
+    with _CLIENTS_LOCK:
+        _SERVICE_CLIENTS.clear()
+        _CONTAINER_CLIENTS.clear()
+    _SHARED_TRANSPORT.session.close()
                                                                      
-def get_container_Service_client(blob_service_client, BLOB_STORAGE_CONTAINER_NAME: str) -> Type['ContainerServiceClient object']:
+def get_container_Service_client(blob_service_client: BlobServiceClient, BLOB_STORAGE_CONTAINER_NAME: str) -> ContainerClient:
     """Get the ContainerClient class that allows you to manipulate Azure Storage containers and their blobs.
 
     Attributes
@@ -62,13 +149,16 @@ def get_container_Service_client(blob_service_client, BLOB_STORAGE_CONTAINER_NAM
 
     Returns
     -------
-      ContainerServiceClient object
+      ContainerServiceClient object (the same object is returned for the same arguments)
     """
-    # Create the ContainerServiceClient object
-    container_client = blob_service_client.get_container_client(container=BLOB_STORAGE_CONTAINER_NAME)
-    return container_client
+    key = (blob_service_client, BLOB_STORAGE_CONTAINER_NAME)
+    with _CLIENTS_LOCK:
+        if key not in _CONTAINER_CLIENTS:
+            # Create the ContainerServiceClient object
+            _CONTAINER_CLIENTS[key] = blob_service_client.get_container_client(container=BLOB_STORAGE_CONTAINER_NAME)
+        return _CONTAINER_CLIENTS[key]
                                                                           
-def get_blob_client(container_client, blob_file_name: str) -> Type['BlobClient object']:
+def get_blob_client(container_client: ContainerClient, blob_file_name: str) -> BlobClient:
     """Get the BlobClient class that allows you to manipulate Azure Storage blobs..
 
     Attributes
@@ -94,51 +184,254 @@ def get_blob_client(container_client, blob_file_name: str) -> Type['BlobClient o
     
     return blob_client
                                                                           
-def upload_file_to_blob():
+def upload_file_to_blob() -> None:
     """Upload a File to Blob storage container using V2 Python SDK."""
-    def show_file_progress(uploaded_size: Union[int, float], total_size: Union[int, float]):
-        """Print Progress while uploading large Files."""
-        bar_total_length = 20
-        percentage_uploaded = int((uploaded_size*100) / total_size)
-        current_bar_length = int(percentage_uploaded * bar_total_length / 100)
-        progress_bar = '|' + '#'*current_bar_length + '|' + str(percentage_uploaded) + '% Completed' 
-        print('\r' + progress_bar, end='', flush=True)
+    last_percentage_uploaded = -1
+    def show_file_progress(uploaded_size: int, total_size: Optional[int]) -> None:
+        """Print Progress while uploading large Files, only when the percentage changes."""
+        nonlocal last_percentage_uploaded
+        if not total_size: # the SDK passes None when the size isn't known
+            return
+        percentage_uploaded = int(uploaded_size*100 // total_size)
+        if percentage_uploaded == last_percentage_uploaded:
+            return
+        bar_grew = percentage_uploaded // 5 != last_percentage_uploaded // 5
+        last_percentage_uploaded = percentage_uploaded
+        sys.stdout.write(f"\r|{'#'*(percentage_uploaded // 5):<20}|{percentage_uploaded}% Completed") # 20 characters long bar
+        if bar_grew: # flushing writes to the terminal, do it only when the bar grows
+            sys.stdout.flush()
                                                                           
     interactive_credential = get_azure_credential('interactive')   # InteractiveBrowserCredential()                                                                  
     blob_service_client = get_blob_Service_client('STORAGE_ACCOUNT_URL', interactive_credential) # BlobServiceClient(STORAGE_ACCOUNT_URL, credential=interactive_credential))
     container_client = get_container_Service_client(blob_service_client, 'BLOB_STORAGE_CONTAINER_NAME') #  blob_service_client.get_container_client(container='BLOB_STORAGE_CONTAINER_NAME')
-    file_name_with_folder_structure_on_blob = '{}/{}/{}'.format('parent_folder', 'child_folder', 'file_name.csv')
+    file_name_with_folder_structure_on_blob = '/'.join(('parent_folder', 'child_folder', 'file_name.csv')) # blob paths always use '/', not os.sep
     file_path_to_read = "./filename.csv"                                                                                                                    
+    # create so-called folder
+    blob_client = get_blob_client(container_client, blob_file_name=file_name_with_folder_structure_on_blob)  # container_client.get_blob_client(blob_file_name)
     try:
-        # create so-called folder
-        blob_client = get_blob_client(container_client, blob_file_name=file_name_with_folder_structure_on_blob)  # container_client.get_blob_client(blob_file_name)
         # upload blob/file
         with open (file_path_to_read, 'rb') as data:
-            blob_client.upload_blob(data, progress_hook=show_file_progress)
-    except ResourceExistsError as Error: # from azure.core.exceptions import ResourceExistsError
-           print(f"you are trying to upload an existing file in the blob")
-           break
+            blob_client.upload_blob(data, length=os.path.getsize(file_path_to_read), progress_hook=show_file_progress,
+                                    max_concurrency=DEFAULT_MAX_CONCURRENCY, overwrite=False)
+    except ResourceExistsError: # from azure.core.exceptions import ResourceExistsError
+        print("you are trying to upload an existing file in the blob")
+        return
+
+def get_file_md5(path: str) -> bytes:
+    """Get the MD5 hash of a local file, computed by OpenSSL over the whole file."""
+    with open(path, 'rb') as file:
+        if hasattr(hashlib, 'file_digest'): # python 3.11+
+            return hashlib.file_digest(file, 'md5').digest()
+        md5 = hashlib.md5()
+        for block in iter(lambda: file.read(MiB), b''):
+            md5.update(block)
+        return md5.digest()
+
+def upload_files_to_blob(container_client: ContainerClient, pairs: Iterable[Tuple[str, str]], concurrency: int = 16,
+                         overwrite: bool = False, store_md5: bool = False) -> None:
+    """Upload many local files to the blob storage container in parallel.
+
+    Uploads of small files are bound by network latency rather than bandwidth, so uploading
+    several files at the same time scales almost linearly until the bandwidth is used up.
+
+    Attributes
+    ----------
+      container_client :  ContainerServiceClient object.
+      pairs : (local file path, blob file name) tuples,
+              ex:- [('./filename.csv', 'parent_folder/child_folder/file_name.csv')]
+      concurrency : number of files uploaded at the same time, about 2-4 times the number of cores.
+      overwrite : replace blob files that already exist, otherwise they are skipped.
+      store_md5 : save the MD5 hash of each file as the Content-MD5 property of its blob, so the
+                  content can be checked later. It is computed once for the whole file before the upload
+                  (not per block with validate_content), this costs an extra read of the file.
+    """
+    def upload_one(file_path_to_read: str, blob_file_name: str) -> None:
+        blob_client = get_blob_client(container_client, blob_file_name=blob_file_name)
+        content_settings = ContentSettings(content_md5=bytearray(get_file_md5(file_path_to_read))) if store_md5 else None
+        try:
+            with open(file_path_to_read, 'rb') as data:
+                blob_client.upload_blob(data, length=os.path.getsize(file_path_to_read), max_concurrency=4, overwrite=overwrite,
+                                        content_settings=content_settings)
+        except ResourceExistsError:
+            print(f"you are trying to upload an existing file in the blob -> {blob_file_name}")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(upload_one, local, remote) for local, remote in pairs]
+        for future in as_completed(futures):
+            future.result() # raise the errors of the failed uploads
+
+def copy_blob_from_url(blob_client: BlobClient, source_url: str, overwrite: bool = False) -> None:
+    """Create a blob file from a file that is already reachable by url (ex:- another blob with a SAS token).
+
+    The copy is done by azure, server to server, the content never passes through this machine.
+    The source can be up to 5000 MiB, for bigger files use blob_client.start_copy_from_url.
+
+    Attributes
+    ----------
+      blob_client :  BlobClient object of the blob file to create.
+      source_url : url of the source file, it must be readable by azure (public or with a SAS token).
+      overwrite : replace the blob file if it already exists.
+    """
+    try:
+        blob_client.upload_blob_from_url(source_url, overwrite=overwrite)
+    except ResourceExistsError:
+        print(f"you are trying to upload an existing file in the blob -> {blob_client.blob_name} (copy from {source_url})")
+
+def download_blob_to_file(blob_client: BlobClient, path: str, max_concurrency: int = 16) -> None:
+    """Download a blob file to a local file, blocks of the blob are downloaded in parallel.
+
+    Attributes
+    ----------
+      blob_client :  BlobClient object of the blob file to download.
+      path : local file path to write the blob content to.
+      max_concurrency : number of parallel connections used to download the blob.
+    """
+    with open(path, 'wb') as file:
+        download_stream = blob_client.download_blob(max_concurrency=max_concurrency)
+        download_stream.readinto(file) # write the downloaded blocks directly into the file
+
+def download_blob_to_buffer(blob_client: BlobClient, max_concurrency: int = 16) -> memoryview:
+    """Download a blob file into memory, blocks of the blob are downloaded in parallel.
+
+    The blocks are written straight into one buffer instead of iterating over chunks and joining
+    the bytes objects, the returned memoryview shares that buffer so the content isn't copied again.
+
+    Attributes
+    ----------
+      blob_client :  BlobClient object of the blob file to download.
+      max_concurrency : number of parallel connections used to download the blob.
+    Returns
+    -------
+      memoryview of the blob content (use bytes(...) if you need a bytes object)
+    """
+    buffer = BytesIO()
+    blob_client.download_blob(max_concurrency=max_concurrency).readinto(buffer)
+    return buffer.getbuffer()
                                                                           
-def list_blobs_in_the_container(container_client, print_list: bool=True) -> list:
+_T = TypeVar('_T')
+
+def prefetched(iterable: Iterable[_T], depth: int = 2) -> Iterator[_T]:
+    """Iterate over an iterable in a background thread, keeping up to depth items ready ahead of the caller.
+
+    Used for the pages of list_blobs, the next page is downloaded while the caller processes the current one.
+    Errors raised by the iterable are raised again in the caller. If the caller stops iterating early
+    (break, an error, or the generator is closed) the background thread stops as well.
+    """
+    items: queue.Queue[Tuple[object, Optional[BaseException]]] = queue.Queue(depth)
+    done = object()
+    stop = threading.Event()
+
+    def put(entry: Tuple[object, Optional[BaseException]]) -> bool:
+        # wait for room in the queue, but give up as soon as the caller has stopped iterating
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def worker() -> None:
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as error:
+            put((done, error))
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close is not None: # release the half read pager of a generator
+                close()
+
+    threading.Thread(target=worker, daemon=True).start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield cast(_T, item)
+    finally:
+        stop.set()
+
+def iter_blob_names(container_client: ContainerClient, name_starts_with: Optional[str] = None) -> Iterator[str]:
+    """Yield the names of the blob files in the container one by one, without building a list.
+
+    Containers can hold millions of blobs, iterating lets the caller filter the names
+    while the pages arrive instead of keeping all of them in memory.
+
+    Attributes
+    ----------
+      container_client :  ContainerServiceClient object.
+      name_starts_with : only the blob files whose name starts with this prefix (filtered by azure).
+
+    usage : for blob_name in iter_blob_names(container_client, name_starts_with='parent_folder/'): ...
+    """
+    # 5000 is the maximum page size, fewer pages means fewer continuation token round trips
+    pages = container_client.list_blobs(name_starts_with=name_starts_with, results_per_page=5000).by_page()
+    # the next pages are fetched in the background while the names of the current page are used
+    for page_names in prefetched([blob.name for blob in page] for page in pages):
+        yield from page_names
+
+def list_blobs_in_the_container(container_client: ContainerClient, print_list: bool=True,
+                                name_starts_with: Optional[str] = None) -> List[str]:
     """Get all the blob files in the container.Print the list if required
     
     usage : list_blobs_in_the_container(container_client, print_list=True)
     """
     print("\nListing blobs...")
     # List the blobs in the container
-    blob_list = container_client.list_blobs()
+    names = list(iter_blob_names(container_client, name_starts_with=name_starts_with))
     if print_list:
-        for blob in blob_list:
-            print("\t" + blob.name)
+        for blob_name in names:
+            print("\t" + blob_name)
     
-    return [blob.name for blob in blob_list]
+    return names
+
+def delete_blobs_batched(container_client: ContainerClient, names: Iterable[str], batch_size: int = 256) -> None:
+    """Delete blob files using batch requests, each request deletes up to batch_size (max 256) files.
+
+    Attributes
+    ----------
+      container_client :  ContainerServiceClient object.
+      names : blob file names to delete, any iterable (ex:- the iter_blob_names generator) is consumed lazily.
+      batch_size : number of deletes sent in one batch request.
+    """
+    names = iter(names)
+    while True:
+        batch = list(itertools.islice(names, batch_size))
+        if not batch:
+            break
+        container_client.delete_blobs(*batch)
 
-def delete_blob_file(container_client, file_name: str):
+def delete_blob_file(container_client: ContainerClient, file_name: str) -> None:
     """Delete a blob file in a azure blob storage container."""
     print(f"Deleting blob File -> {file_name}")
-    container_client.delete_blobs(file_name)
+    delete_blobs_batched(container_client, [file_name])
     
-def delete_all_blobs_that_matching_string_in_their_name(container_client, matching_string: Union[list, str]):
+def _sub_string_matcher(sub_strings: List[str]) -> Callable[[str], bool]:
+    """Get a function that tells if a name contains any of the sub strings.
+
+    With several sub strings and pyahocorasick installed all of them are searched in a single
+    scan of the name, otherwise every sub string is searched one after the other.
+    """
+    if not sub_strings: # nothing to match, an automaton without words can't be searched
+        return lambda name: False
+    if len(sub_strings) == 1:
+        sub_string = sub_strings[0]
+        return lambda name: sub_string in name
+    if ahocorasick is None or '' in sub_strings: # an empty sub string matches every name, the automaton can't hold it
+        return lambda name: any(sub_string in name for sub_string in sub_strings)
+    automaton = ahocorasick.Automaton()
+    for index, sub_string in enumerate(sub_strings):
+        automaton.add_word(sub_string, index)
+    automaton.make_automaton()
+    return lambda name: next(automaton.iter(name), None) is not None
+
+def delete_all_blobs_that_matching_string_in_their_name(container_client: ContainerClient, matching_string: Union[List[str], str],
+                                                        prefix: bool = False) -> None:
     """Delete all files associated with a sub string.
     
     This Function should be used if you wanted to delete
@@ -146,17 +439,26 @@ def delete_all_blobs_that_matching_string_in_their_name(container_client, matchi
       2) If you have a virtual folders setup in the blob storage container and 
          wanted to delete all files under that folder/occurrences of that folder 
          at different places in the virtual folder structure.
+
+    Set prefix=True if the strings are the start of the file names (ex:- a top level virtual folder
+    'inputs_folder/'), then azure returns only the matching files instead of listing the whole container.
     
     usage: #delete_job_files(container_client, 'inputs_folder)
+           #delete_job_files(container_client, 'inputs_folder/', prefix=True)
     """
-    if isinstance(matching_string, str):
-        name_list = [matching_string]
-    for name in name_list:
-        print(f"Deleting files of job -> {name}")
-        blob_list = list_blobs_in_the_container(container_client, print_list=False)
-        list_to_delete = [i for i in blob_list if name in i]
-        for file_to_delete in list_to_delete:
-            delete_blob_file(container_client, file_to_delete)
+    name_list = [matching_string] if isinstance(matching_string, str) else list(matching_string)
+    print(f"Deleting files of job -> {', '.join(name_list)}")
+    list_to_delete: Iterator[str]
+    if prefix:
+        # a prefix that starts with another prefix of the list matches the same files again, skip it
+        name_list = list(dict.fromkeys(name_list))
+        prefixes = [name for name in name_list if not any(name != other and name.startswith(other) for other in name_list)]
+        list_to_delete = itertools.chain.from_iterable(iter_blob_names(container_client, name_starts_with=name) for name in prefixes)
+    else:
+        # list the container once for all the names, matching files are deleted while the pages arrive
+        is_match = _sub_string_matcher(name_list)
+        list_to_delete = (i for i in iter_blob_names(container_client) if is_match(i))
+    delete_blobs_batched(container_client, list_to_delete)
 
                                                                           
 def read_csv_from_blob_container(container_client: ContainerClient, file_name: str) -> Union[pd.DataFrame, bool]:
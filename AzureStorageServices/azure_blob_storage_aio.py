@@ -0,0 +1,160 @@
+"""
+Asynchronous versions of the helpers in azure_blob_storage.py.
+
+The synchronous clients wait for every request to finish before sending the next one, so uploading
+or deleting many small blobs spends most of its time waiting on the network. The clients in
+azure.storage.blob.aio let us keep many requests in flight on one event loop, here the blob
+operations are collected first and then sent together with asyncio.gather.
+
+Note:- the aio clients own an aiohttp session, they must be closed when you are done with them,
+       the easiest way to do that is to use them as async context managers.
+
+usage :
+  async def main():
+      credential = get_azure_credential('default')
+      async with credential, get_blob_Service_client('STORAGE_ACCOUNT_URL', credential) as blob_service_client:
+          container_client = get_container_Service_client(blob_service_client, 'BLOB_STORAGE_CONTAINER_NAME')
+          await upload_files(container_client, [('./first.csv', 'parent_folder/first.csv'),
+                                                ('./second.csv', 'parent_folder/second.csv')])
+
+  asyncio.run(main())
+"""
+from __future__ import annotations
+
+#import azure python sdk packages
+from azure.identity.aio import DefaultAzureCredential
+from azure.storage.blob.aio import BlobServiceClient, BlobClient, ContainerClient
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.core.exceptions import ResourceExistsError
+
+# import other packages
+import asyncio
+from typing import Awaitable, Iterable, List, Tuple, Union
+
+def get_azure_credential(type: str ='default') -> DefaultAzureCredential:
+  """Create an async credential to authenticate the aio clients.
+
+  azure.identity.aio does not provide an InteractiveBrowserCredential, so only the
+  default credential is available here, use azure_blob_storage.py for browser based authentication.
+  """
+  if type == 'default':
+    credential = DefaultAzureCredential()
+  else:
+    raise ValueError(f"credential type '{type}' is not supported by the aio clients")
+
+  return credential
+
+def get_blob_Service_client(STORAGE_ACCOUNT_URL: str, credential: AsyncTokenCredential) -> BlobServiceClient:
+    """Get the async BlobServiceClient class that allows you to manipulate Azure Storage resources and blob containers.
+
+    Attributes
+    ----------
+      STORAGE_ACCOUNT_URL : URL string that identifies the azure storage account.
+      credential : async Credential object which is used for authentication.
+    Returns
+    -------
+      aio BlobServiceClient object (use it with 'async with' so the connection is closed)
+    """
+    # Create the BlobServiceClient object
+    blob_service_client = BlobServiceClient(STORAGE_ACCOUNT_URL, credential=credential)
+    return blob_service_client
+
+def get_container_Service_client(blob_service_client: BlobServiceClient, BLOB_STORAGE_CONTAINER_NAME: str) -> ContainerClient:
+    """Get the async ContainerClient class that allows you to manipulate Azure Storage containers and their blobs.
+
+    Attributes
+    ----------
+      blob_service_client :  aio BlobServiceClient object.
+      BLOB_STORAGE_CONTAINER_NAME : Name of the blob storage container inside the storage account linked with BlobServiceClient object.
+
+    Returns
+    -------
+      aio ContainerClient object
+    """
+    # Create the ContainerClient object, it shares the connection of the BlobServiceClient
+    container_client = blob_service_client.get_container_client(container=BLOB_STORAGE_CONTAINER_NAME)
+    return container_client
+
+def get_blob_client(container_client: ContainerClient, blob_file_name: str) -> BlobClient:
+    """Get the async BlobClient class that allows you to manipulate Azure Storage blobs.
+
+    Attributes
+    ----------
+      container_client :  aio ContainerClient object.
+      blob_file_name : Name of the blob file in the container linked to ContainerClient object
+                       (folder structure is part of the file name, ex:- Parent/Child/File.csv)
+
+    Returns
+    -------
+      aio BlobClient object
+    """
+    # Create the BlobClient object
+    blob_client = container_client.get_blob_client(blob_file_name)
+
+    return blob_client
+
+async def _gather_bounded(awaitables: Iterable[Awaitable[None]], semaphore: asyncio.Semaphore) -> None:
+    """Await all the blob operations with at most the semaphore's value in flight.
+
+    Every operation is awaited to the end even if some of them fail, then the first error is raised,
+    so no request is left running unobserved.
+    """
+    async def bounded(awaitable: Awaitable[None]) -> None:
+        async with semaphore:
+            await awaitable
+
+    results = await asyncio.gather(*(bounded(awaitable) for awaitable in awaitables), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+async def upload_files(container_client: ContainerClient, pairs: Iterable[Tuple[str, str]], concurrency: int = 16) -> None:
+    """Upload many local files to the blob storage container at the same time.
+
+    Attributes
+    ----------
+      container_client :  aio ContainerClient object.
+      pairs : (local file path, blob file name) tuples,
+              ex:- [('./filename.csv', 'parent_folder/child_folder/file_name.csv')]
+      concurrency : maximum number of uploads in flight, so we don't open every file at once.
+    """
+    async def upload_one(file_path_to_read: str, blob_file_name: str) -> None:
+        blob_client = get_blob_client(container_client, blob_file_name)
+        try:
+            with open(file_path_to_read, 'rb') as data:
+                await blob_client.upload_blob(data)
+        except ResourceExistsError: # existing blobs are skipped, the other uploads carry on
+            print(f"you are trying to upload an existing file in the blob -> {blob_file_name}")
+
+    await _gather_bounded((upload_one(local, remote) for local, remote in pairs), asyncio.Semaphore(concurrency))
+
+async def list_blobs_in_the_container(container_client: ContainerClient, print_list: bool=True) -> List[str]:
+    """Get all the blob files in the container.Print the list if required
+
+    usage : await list_blobs_in_the_container(container_client, print_list=True)
+    """
+    print("\nListing blobs...")
+    blob_names = [blob.name async for blob in container_client.list_blobs()]
+    if print_list:
+        for blob_name in blob_names:
+            print("\t" + blob_name)
+
+    return blob_names
+
+async def delete_all_blobs_that_matching_string_in_their_name(container_client: ContainerClient, matching_string: Union[List[str], str],
+                                                              concurrency: int = 16) -> None:
+    """Delete all files associated with a sub string, all the matches of a sub string are deleted together.
+
+    See azure_blob_storage.delete_all_blobs_that_matching_string_in_their_name for the use cases,
+    at most concurrency deletes are in flight at the same time.
+
+    usage: await delete_all_blobs_that_matching_string_in_their_name(container_client, 'inputs_folder')
+    """
+    name_list = [matching_string] if isinstance(matching_string, str) else matching_string
+    semaphore = asyncio.Semaphore(concurrency)
+    blob_list = await list_blobs_in_the_container(container_client, print_list=False)
+    for name in name_list:
+        print(f"Deleting files of job -> {name}")
+        list_to_delete = [i for i in blob_list if name in i]
+        await _gather_bounded((container_client.delete_blob(file_to_delete) for file_to_delete in list_to_delete), semaphore)
+        blob_list = [i for i in blob_list if name not in i] # already deleted, don't match them again for the next name